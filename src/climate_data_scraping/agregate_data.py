@@ -1,14 +1,53 @@
 from pathlib import Path
 from typing import Union
 
+import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
 
+from cached_read import read_csv_cached
 from find_dates import get_random_filename
+from history_io import (
+    HISTORY_SUFFIXES,
+    read_history,
+    read_history_columns,
+    station_files,
+)
+
+# Decimals kept in the exported means; hides float32 rounding noise
+EXPORT_DECIMALS = 6
+
+
+def _build_one(
+    param: str,
+    frames: list[pd.DataFrame],
+    states: list[str],
+    treated_dir: Path,
+) -> None:
+    """Average one parameter by date and state and export it to Excel."""
+    if not frames:
+        print(f"No data found for parameter '{param}'. Skipping export.")
+        return
+
+    big = pd.concat(frames, ignore_index=True)
+    table = (
+        big.groupby(["datetime", "state"], sort=True, observed=True)["value"]
+        .mean()
+        .unstack("state")
+        .reindex(columns=states)
+        .rename_axis(index="date", columns=None)
+        .astype(np.float64)
+        .round(EXPORT_DECIMALS)
+    )
+
+    out_path = treated_dir / f"{param}.xlsx"
+    table.to_excel(out_path, engine="xlsxwriter")
+    print(f"Exported {out_path.name}")
 
 
 def build_state_mean_tables(base_path: Union[str, Path]) -> None:
     """
-    Build daily state-average tables from NASA-POWER station CSVs and export
+    Build daily state-average tables from NASA-POWER station files and export
     one Excel file per parameter.
 
     Workflow
@@ -17,13 +56,16 @@ def build_state_mean_tables(base_path: Union[str, Path]) -> None:
        abbreviations (``SG_ESTADO``).
     2. Pick a single random historical file—via :pyfunc:`get_random_filename`—
        to discover which parameter columns exist.
-    3. For each parameter:
-       • loop through every file in *history/*;  
+    3. Loop through every file in *history/* once, reading all parameter
+       columns in a single pass; for each parameter:
        • extract the series for that parameter;  
        • tag each observation with its host state;  
-       • store the records in a dictionary.
-    4. Convert the dictionary to a ``DataFrame``, average by date across
-       stations belonging to the same state, and write the result to
+       • collect the tagged series in that parameter's list of long-form
+         frames.
+    4. For each parameter—in parallel worker processes via
+       :pyfunc:`_build_one`—concatenate the frames once, average by
+       (date, state) across stations belonging to the same state, unstack
+       into a date × state table and write the result to
        ``treated_data/<parameter>.xlsx``.
 
     Parameters
@@ -38,58 +80,45 @@ def build_state_mean_tables(base_path: Union[str, Path]) -> None:
     treated_dir = base_path / "treated_data"
     treated_dir.mkdir(parents=True, exist_ok=True)
 
-    catalogue = pd.read_csv(base_path / "metadata" / "catalogue.csv")
+    catalogue = read_csv_cached(base_path / "metadata" / "catalogue.csv")
     code_to_state = (
         catalogue.set_index("CD_ESTACAO")["SG_ESTADO"].astype(str).to_dict()
     )
 
-    sample_path = history_dir / get_random_filename(str(history_dir), extension_filter=".csv")
-    parameters = pd.read_csv(sample_path, nrows=0).columns[1:]
+    sample_path = history_dir / get_random_filename(
+        str(history_dir), extension_filter=HISTORY_SUFFIXES
+    )
+    parameters = read_history_columns(sample_path)
 
     states = ["DF", "GO", "MG", "MS", "MT", "PR", "RJ", "RS", "SC", "SP"]
+    state_dtype = pd.CategoricalDtype(states)
 
-    for param in parameters:
-        records: dict[int, tuple] = {}
-        rec_id = 0
+    per_param: dict[str, list[pd.DataFrame]] = {p: [] for p in parameters}
 
-        for csv_path in history_dir.glob("*.csv"):
-            station_code = csv_path.stem.split("_")[0]
-            state = code_to_state.get(station_code)
+    for station_code, hist_path in station_files(history_dir).items():
+        state = code_to_state.get(station_code)
 
-            if state not in states:
-                continue
-
-            df = (
-                pd.read_csv(
-                    csv_path,
-                    usecols=["datetime", param],
-                    parse_dates=["datetime"]
-                )
-                .set_index("datetime")
-            )
-
-            for ts, value in df[param].items():
-                row = {uf: None for uf in states}
-                row[state] = float(value)
-                records[rec_id] = (ts, *row.values())
-                rec_id += 1
-
-        if not records:
-            print(f"No data found for parameter '{param}'. Skipping export.")
+        if state not in states:
             continue
 
-        table = pd.DataFrame.from_dict(
-            records,
-            orient="index",
-            columns=["date", *states],
+        df = read_history(hist_path, columns=["datetime", *parameters])
+        state_col = pd.Categorical.from_codes(
+            np.full(len(df), states.index(state), dtype=np.int8),
+            dtype=state_dtype,
         )
+        for p in parameters:
+            per_param[p].append(
+                df[["datetime", p]]
+                .rename(columns={p: "value"})
+                .assign(state=state_col)
+            )
 
-        table["date"] = pd.to_datetime(table["date"])
-        table.set_index("date", inplace=True)
-        table = table.groupby("date").mean(numeric_only=True)
+    # Reduction + Excel export are independent per parameter → one process each
+    Parallel(n_jobs=-1, backend="loky")(
+        delayed(_build_one)(param, frames, states, treated_dir)
+        for param, frames in per_param.items()
+    )
 
-        out_path = treated_dir / f"{param}.xlsx"
-        table.to_excel(out_path)
-        print(f"Exported {out_path.name}")
 
-build_state_mean_tables("C:/Users/raulp/FG A/FG A - Área de Mercado/Extrações/NASA/extrair_dados_nasa_power/src/extrair_dados_nasa_power/")
\ No newline at end of file
+if __name__ == "__main__":
+    build_state_mean_tables("C:/Users/raulp/FG A/FG A - Área de Mercado/Extrações/NASA/extrair_dados_nasa_power/src/extrair_dados_nasa_power/")
@@ -0,0 +1,49 @@
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Union
+
+import pandas as pd
+
+
+def read_csv_cached(csv_path: Union[str, Path]) -> pd.DataFrame:
+    """Read *csv_path*, reusing a pickled copy stored beside it.
+
+    The pickle (same name, ``.pkl`` suffix) is rebuilt whenever the CSV is
+    newer than it, so edits to the metadata files are picked up on the next
+    run while unchanged files skip the CSV parse entirely. An unreadable
+    pickle (truncated write, incompatible pandas version) is rebuilt too.
+
+    Parameters
+    ----------
+    csv_path : str | pathlib.Path
+        Metadata CSV to load (e.g. ``metadata/catalogue.csv``).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Same frame ``pd.read_csv(csv_path)`` would return.
+    """
+    csv_path = Path(csv_path)
+    cache = csv_path.with_suffix(".pkl")
+
+    if cache.exists() and cache.stat().st_mtime >= csv_path.stat().st_mtime:
+        try:
+            with open(cache, "rb") as fh:
+                return pickle.load(fh)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            pass  # fall through and rebuild from the CSV
+
+    df = pd.read_csv(csv_path)
+
+    # write to a temp file first so an interrupted dump never replaces the cache
+    fd, tmp_name = tempfile.mkstemp(dir=cache.parent, suffix=".pkl.tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(df, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, cache)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    return df
@@ -9,6 +9,13 @@ from concatenate import concat_preserving_second
 from delete_file import safe_delete
 from extract_data import extract_data_multiple_coordinates
 from find_dates import find_start_and_end_date
+from history_io import (
+    iter_history_files,
+    read_history,
+    read_last_date,
+    station_files,
+    write_history,
+)
 
 def check_up_to_date(base_path: Union[str, Path]) -> bool:
     """
@@ -58,11 +65,14 @@ def update_history(base_path: str) -> None:
     The function performs three high‑level steps:
 
     1. **Determine date window** using :pyfunc:`find_start_and_end_date`.
+       When the historical files really end on ``orig_end`` with readings
+       on that day (not -999 placeholders), the two‑day overlap buffer is
+       dropped and only ``orig_end + 1`` onwards is requested.
     2. **Download** the update set (delegated to
        :pyfunc:`extract_data_multiple_coordinates`).
-    3. **Merge** each update CSV with its matching historical CSV, letting the
-       update override overlaps, and save a new file whose end‑date reflects
-       the latest data.
+    3. **Merge** each update file with its matching historical file, letting
+       the update override overlaps, and save a new Parquet file whose
+       end‑date reflects the latest data.
 
     Parameters
     ----------
@@ -71,16 +81,38 @@ def update_history(base_path: str) -> None:
 
     Notes
     -----
-    *Historical filenames must follow* ``<code>_<start>_<end>.csv`` *pattern.*
+    *Historical filenames must follow* ``<code>_<start>_<end>.parquet``
+    *pattern* (legacy ``.csv`` files are read and replaced by Parquet).
     """
 
     base = Path(base_path)
     history_dir = base / "history"
     update_dir = base / "update"
 
+    # index historical files by station code once (Parquet over legacy CSV)
+    hist_by_code = station_files(history_dir)
+
     # 1) Date window
     orig_start, orig_end, new_start, new_end = find_start_and_end_date(history_dir)
 
+    # skip the overlap buffer only when the stored tail matches the filename
+    # date and holds real readings; unpublished days come back as NaN rows
+    # and must be downloaded again
+    sample = next(
+        (f for f in hist_by_code.values() if f.stem.endswith(orig_end)), None
+    )
+    if (
+        sample is not None
+        and read_last_date(sample, with_readings=True) == pd.Timestamp(orig_end)
+    ):
+        new_start = (
+            datetime.strptime(orig_end, "%Y%m%d") + timedelta(days=1)
+        ).strftime("%Y%m%d")
+
+    if new_start > new_end:
+        print("Nothing new to download.")
+        return
+
     # 2) Download new data (optional)
     extract_data_multiple_coordinates(
         log=None,
@@ -90,35 +122,34 @@ def update_history(base_path: str) -> None:
         history=False,
     )
 
-    # 3) Merge each update file with its historical counterpart
-    for upd_file in update_dir.glob("*.csv"):
-        update_df = (
-            pd.read_csv(upd_file, parse_dates=["datetime"]).set_index("datetime")
-        )
+    # 3) Merge each update file with its historical counterpart; older
+    #    windows first so the newest download wins on overlapping dates
+    for upd_file in sorted(
+        iter_history_files(update_dir), key=lambda f: f.stem.split("_")[2]
+    ):
+        update_df = read_history(upd_file).set_index("datetime")
         code = upd_file.stem.split("_")[0]
 
-        # find the first matching historical file for this code
-        try:
-            hist_file = next(f for f in history_dir.glob(f"{code}_*_*.csv"))
-        except StopIteration:
+        hist_file = hist_by_code.get(code)
+        if hist_file is None:
             print(f"No historical file found for station code {code}; skipping.")
             continue
 
-        history_df = (
-            pd.read_csv(hist_file, parse_dates=["datetime"]).set_index("datetime")
-        )
+        history_df = read_history(hist_file).set_index("datetime")
 
         # remove the old historical file
         safe_delete(hist_file)
 
         # concatenate and save with updated end‑date
-        out_path = history_dir / f"{code}_{orig_start}_{new_end}.csv"
-        concat_preserving_second(history_df, update_df).to_csv(out_path)
+        out_path = history_dir / f"{code}_{orig_start}_{new_end}.parquet"
+        write_history(concat_preserving_second(history_df, update_df), out_path)
+        hist_by_code[code] = out_path  # later update files merge into this one
         print(f"Updated history for {code} → {out_path.name}")
 
-base = "C:/Users/raulp/FG A/FG A - Área de Mercado/Extrações/NASA/extrair_dados_nasa_power/src/extrair_dados_nasa_power/"
+if __name__ == "__main__":
+    base = "C:/Users/raulp/FG A/FG A - Área de Mercado/Extrações/NASA/extrair_dados_nasa_power/src/extrair_dados_nasa_power/"
 
-if not check_up_to_date(base):
-    update_history(base)
-else:
-    print("Dados já atualizados")
\ No newline at end of file
+    if not check_up_to_date(base):
+        update_history(base)
+    else:
+        print("Dados já atualizados")
@@ -38,9 +38,9 @@ def concat_preserving_second(
     if not df1.columns.equals(df2.columns):
         raise ValueError("DataFrames must have identical column sets.")
 
-    # 2) Filter rows unique to df1, then concatenate with df2 ---------------
-    df1_unique = df1.loc[~df1.index.isin(df2.index)]
-    combined = pd.concat([df1_unique, df2])
+    # 2) Keep df1 rows absent from df2, then concatenate the disjoint frames
+    keep = df1.index.difference(df2.index, sort=False)
+    combined = pd.concat([df1.loc[keep], df2], copy=False)
 
     # 3) Optional: sort the resulting index ---------------------------------
     if sort_index:
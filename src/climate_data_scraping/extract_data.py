@@ -1,16 +1,58 @@
 from __future__ import annotations
 
+import io
 import os
-import time
+import threading
+import numpy as np
 import pandas as pd
 import requests
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from tqdm import tqdm
 from typing import Union
+from urllib3.util import Retry
+
+from cached_read import read_csv_cached
+from history_io import HISTORY_SUFFIXES, write_history
 
 # Start timer for the entire script
 beg = datetime.now()
 
+# Shared keep-alive session, sized for the download thread pool; transient
+# errors are retried at the adapter with exponential backoff (0, 10, 20, 40 s)
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=4,
+            backoff_factor=5,
+            status_forcelist=[429, 500, 502, 503, 504],
+        ),
+    ),
+)
+
+
+class _RateLimiter:
+    """Token bucket allowing at most *calls* requests per *period* seconds."""
+
+    def __init__(self, calls: int, period: float) -> None:
+        self._tokens = threading.Semaphore(calls)
+        self._period = period
+
+    def wait(self) -> None:
+        """Block until a token is free; it is returned *period* s later."""
+        self._tokens.acquire()
+        timer = threading.Timer(self._period, self._tokens.release)
+        timer.daemon = True
+        timer.start()
+
+
 def extract_data_coord(
     params: str = "IMERG_PRECTOT",
     coords: tuple[float, float] = (-47.81, -21.17),
@@ -44,8 +86,7 @@ def extract_data_coord(
     Returns
     -------
     pd.DataFrame
-        DataFrame indexed by ``datetime`` with columns converted to
-        appropriate data types.
+        DataFrame indexed by ``datetime`` with ``float32`` columns.
     """
 
     # 1) Build query parameters
@@ -61,44 +102,34 @@ def extract_data_coord(
     }
 
     # 2) GET request
-    response = requests.get(base_url, params=query_params)
+    response = _SESSION.get(base_url, params=query_params, timeout=60)
 
     if response.status_code != 200:
-        print(f"Request error: {response.status_code}")
-        print(response.text)
+        # one line via tqdm so the download progress bar stays intact
+        tqdm.write(f"   ⚠️  request error {response.status_code} for {coords}")
         return pd.DataFrame()  # return empty DataFrame on failure
 
     csv_text = response.text
 
-    # 3) Convert CSV to DataFrame
-    lines = [row.split(",") for row in csv_text.splitlines()]
-
-    # Locate the header line ("YEAR,DOY,...")
-    for i, row in enumerate(lines):
-        if "YEAR" in row:
-            header_pos = i
-            break
-
-    table = lines[header_pos:]
-    columns = table[0]   # header
-    rows = table[1:]     # data
-
-    df = pd.DataFrame(rows, columns=columns)
-
-    # Type casting: YEAR, DOY → int | others → float
-    for idx, col in enumerate(df.columns):
-        df[col] = df[col].astype(int if idx < 2 else float)
-
-    # 4) Create datetime index
-    df["datetime"] = pd.to_datetime(
-        df.iloc[:, 0].astype(str) + df.iloc[:, 1].astype(str),  # YEAR + DOY
-        format="%Y%j",
+    # 3) Convert CSV to DataFrame, skipping the metadata block that precedes
+    #    the header line ("YEAR,DOY,...") and mapping -999 to missing values.
+    #    YEAR/DOY → int32, readings → float32 (low-precision measurements),
+    #    typed by the parser itself rather than cast afterwards.
+    header_start = 0 if csv_text.startswith("YEAR,") else csv_text.index("\nYEAR,") + 1
+    df = pd.read_csv(
+        io.StringIO(csv_text[header_start:]),
+        dtype=defaultdict(lambda: np.float32, YEAR=np.int32, DOY=np.int32),
+        na_values=[-999],
     )
-    df.set_index("datetime", inplace=True)
-    df.drop(df.columns[[0, 1]], axis=1, inplace=True)  # remove YEAR, DOY
 
-    # 5) Handle missing values
-    df.replace(-999, pd.NA, inplace=True)
+    # 4) Create datetime index from YEAR/DOY with integer date arithmetic
+    year = df["YEAR"].to_numpy()
+    doy = df["DOY"].to_numpy()
+    days = (year - 1970).astype("datetime64[Y]").astype("datetime64[D]") + (
+        (doy - 1).astype("timedelta64[D]")
+    )
+    df.index = pd.DatetimeIndex(days.astype("datetime64[ns]"), name="datetime")
+    df.drop(columns=["YEAR", "DOY"], inplace=True)
 
     return df
 
@@ -113,12 +144,13 @@ def extract_data_multiple_coordinates(
     ),
     valid_states: list[str] | None = None,
     history: bool = True,
+    max_workers: int = 12,
 ) -> None:
     """
     Download NASA POWER data for INMET automatic weather stations.
 
     Creates a *history* or *update* sub-folder (depending on ``history``)
-    inside *base_path* and writes one CSV per station. Coastal stations and
+    inside *base_path* and writes one Parquet file per station. Coastal stations and
     states not listed in ``valid_states`` are ignored.
 
     Parameters
@@ -134,6 +166,9 @@ def extract_data_multiple_coordinates(
         List of Brazilian state abbreviations to keep.  ``None`` → default set.
     history
         ``True`` → write to *history/*, ``False`` → *update/*.
+    max_workers
+        Number of stations downloaded concurrently. Requests are throttled
+        to ``max_workers`` per ``3 + years/4`` seconds.
     """
     if valid_states is None:
         valid_states = [
@@ -152,11 +187,11 @@ def extract_data_multiple_coordinates(
     coastal_path = base_path / "metadata" / "coastal.csv"
 
     # Read metadata 
-    inmet_catalogue = pd.read_csv(catalogue_path)[[
+    inmet_catalogue = read_csv_cached(catalogue_path)[[
         "DC_NOME", "SG_ESTADO", "VL_LATITUDE",
         "VL_LONGITUDE", "CD_ESTACAO"
     ]]
-    coastal_codes = set(pd.read_csv(coastal_path)["CD_ESTACAO"])
+    coastal_codes = set(read_csv_cached(coastal_path)["CD_ESTACAO"])
 
     eligible = inmet_catalogue[
         (inmet_catalogue["SG_ESTADO"].isin(valid_states)) &
@@ -171,64 +206,57 @@ def extract_data_multiple_coordinates(
     total_data_by_state = {uf: 0 for uf in valid_states}
     routine_start = datetime.now()
 
-    # Main loop
-    for idx, station in eligible.iterrows():
-        save_path = nasa_dir / f"{station['CD_ESTACAO']}_{start}_{end}.csv"
-        if save_path.exists():
-            continue
-
-        consecutive_errors = 0
-        while True:
-            try:
-                print(f"({idx + 1}/{total_valid}) Station {station['CD_ESTACAO']}")
-                station_start = datetime.now()
-
-                df = extract_data_coord(
-                    coords=(station["VL_LATITUDE"], station["VL_LONGITUDE"]),
-                    start=start,
-                    end=end,
-                )
-
-                # Retry logic for empty frames
-                if df.empty:
-                    consecutive_errors += 1
-                    if consecutive_errors >= 4:
-                        print(
-                            f"   ❌ station {station['CD_ESTACAO']} yielded empty data "
-                            "four times in a row – skipping."
-                        )
-                        break
-                    print(
-                        f"   ⚠️  station {station['CD_ESTACAO']} returned no data – "
-                        f"retry {consecutive_errors}/4 in 40 s…"
-                    )
-                    time.sleep(40)
-                    continue
-
-                # Success
-                consecutive_errors = 0
-                df.to_csv(save_path, index=False)
-                total_data_by_state[station["SG_ESTADO"]] += 1
-                print(
-                    f"   ✓ completed in {datetime.now() - station_start}  "
-                    f"(elapsed {datetime.now() - routine_start})"
-                )
-
-                # Sleep ~3 s per year requested
-                optimal_sleep_time = 3 + (int(end[:4]) - int(start[:4]))/4
-                time.sleep(optimal_sleep_time)
-                break
-
-            except Exception as err:  # noqa: BLE001
-                consecutive_errors += 1
-                if consecutive_errors >= 4:
-                    print(
-                        f"   ❌ station {station['CD_ESTACAO']} hit the same error "
-                        f"four times in a row – skipping. Last error: {err}"
-                    )
-                    break
-                print(f"   ⚠️  error ({err}); retry {consecutive_errors}/4 in 40 s…")
-                time.sleep(40)
+    # Token bucket replacing the fixed ~3 s/year sleep between stations
+    limiter = _RateLimiter(
+        calls=max_workers,
+        period=3 + (int(end[:4]) - int(start[:4])) / 4,
+    )
+
+    def _fetch(station: dict) -> str | None:
+        """Download one station; return its state on success, else ``None``."""
+        save_path = nasa_dir / f"{station['CD_ESTACAO']}_{start}_{end}.parquet"
+        if any(save_path.with_suffix(s).exists() for s in HISTORY_SUFFIXES):
+            return None  # already downloaded (Parquet or legacy CSV)
+
+        # Transient failures (429/5xx, dropped connections) are already
+        # retried with backoff by the session adapter
+        limiter.wait()
+        try:
+            df = extract_data_coord(
+                coords=(station["VL_LATITUDE"], station["VL_LONGITUDE"]),
+                start=start,
+                end=end,
+            )
+        except Exception as err:  # noqa: BLE001
+            tqdm.write(
+                f"   ❌ station {station['CD_ESTACAO']} failed after retries – "
+                f"skipping. Last error: {err}"
+            )
+            return None
+
+        if df.empty:
+            tqdm.write(f"   ❌ station {station['CD_ESTACAO']} returned no data – skipping.")
+            return None
+
+        try:
+            write_history(df, save_path)
+        except Exception as err:  # noqa: BLE001
+            tqdm.write(
+                f"   ❌ station {station['CD_ESTACAO']} could not be saved – "
+                f"skipping. Error: {err}"
+            )
+            return None
+
+        # Success
+        return station["SG_ESTADO"]
+
+    # Main loop – stations are network-bound, so overlap them on threads;
+    # a single progress bar replaces the per-station status lines
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(_fetch, eligible.to_dict("records"))
+        for state in tqdm(results, total=total_valid, desc="Stations"):
+            if state is not None:
+                total_data_by_state[state] += 1
 
     # 4) Summary
     print(f"\nTotal time: {datetime.now() - routine_start}")
@@ -236,4 +264,5 @@ def extract_data_multiple_coordinates(
     for uf, qty in total_data_by_state.items():
         print(f" • {uf}: {qty}")
 
-print(extract_data_coord(params="IMERG_PRECTOT,T2M"))
\ No newline at end of file
+if __name__ == "__main__":
+    print(extract_data_coord(params="IMERG_PRECTOT,T2M"))
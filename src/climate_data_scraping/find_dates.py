@@ -1,21 +1,42 @@
+import functools
 import os
 from datetime import datetime, timedelta, UTC
 import random
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
+
+from history_io import station_files
 
 beg = datetime.now()
 
 
-def get_random_filename(folder_path: str, *, extension_filter: Optional[str] = None) -> str:
+@functools.lru_cache(maxsize=16)
+def _list_files(folder_path: str, ext: Tuple[str, ...], mtime_ns: int) -> Tuple[str, ...]:
+    """List the files in *folder_path* ending with *ext* (all when empty).
+
+    *mtime_ns* is only part of the cache key: adding or removing files bumps
+    the directory mtime, so a stale listing is never served.
+    """
+    with os.scandir(folder_path) as it:
+        return tuple(
+            e.name for e in it
+            if e.is_file() and (not ext or e.name.lower().endswith(ext))
+        )
+
+
+def get_random_filename(
+    folder_path: str,
+    *,
+    extension_filter: Optional[Union[str, Tuple[str, ...]]] = None,
+) -> str:
     """Return the *name* of a random file located inside *folder_path*.
 
     Parameters
     ----------
     folder_path : str
         Absolute or relative path to the directory to sample from.
-    extension_filter : str, optional
-        If provided (e.g. ``".csv"``), only files ending with that extension
-        are considered. Case-insensitive.
+    extension_filter : str | tuple[str, ...], optional
+        If provided (e.g. ``".csv"`` or ``(".parquet", ".csv")``), only files
+        ending with one of those extensions are considered. Case-insensitive.
 
     Returns
     -------
@@ -31,14 +52,13 @@ def get_random_filename(folder_path: str, *, extension_filter: Optional[str] = N
     if not os.path.isdir(folder_path):
         raise FileNotFoundError(f"Directory not found: {folder_path}")
 
-    files = [
-        f for f in os.listdir(folder_path)
-        if os.path.isfile(os.path.join(folder_path, f))
-    ]
+    if isinstance(extension_filter, str):
+        extension_filter = (extension_filter,)
+    ext = tuple(e.lower() for e in extension_filter) if extension_filter else ()
 
-    if extension_filter:
-        ext = extension_filter.lower()
-        files = [f for f in files if f.lower().endswith(ext)]
+    files = _list_files(
+        os.fspath(folder_path), ext, os.stat(folder_path).st_mtime_ns
+    )
 
     if not files:
         raise FileNotFoundError("No files matching the criteria were found in the directory.")
@@ -48,7 +68,8 @@ def get_random_filename(folder_path: str, *, extension_filter: Optional[str] = N
 def find_start_and_end_date(history_path: str) -> Tuple[str, str]:
     """Derive *start* and *end* dates for incremental downloads.
 
-    The function picks **one random file** from *history_path* to infer the last
+    The function picks **one random station file** from *history_path*
+    (Parquet preferred over a leftover legacy CSV) to infer the last
     available date (`original_end`) embedded in the filename – it assumes the
     filename ends with an eight‑digit string in ``YYYYMMDD`` format (just
     before the extension).
@@ -62,7 +83,7 @@ def find_start_and_end_date(history_path: str) -> Tuple[str, str]:
     Parameters
     ----------
     history_path : str
-        Folder containing historical CSV files previously downloaded.
+        Folder containing historical station files previously downloaded.
 
     Returns
     -------
@@ -76,10 +97,13 @@ def find_start_and_end_date(history_path: str) -> Tuple[str, str]:
     changes.
     """
 
-    # Pick a random file from the history folder and extract the trailing date
-    random_file = get_random_filename(history_path)
-    original_end = random_file.split("_")[2][:-4]  # grab 'YYYYMMDD'
-    original_start = random_file.split("_")[1]  # grab 'YYYYMMDD'
+    # Pick a random station file and extract the trailing date
+    files = list(station_files(history_path).values())
+    if not files:
+        raise FileNotFoundError(f"No station files found in {history_path}")
+    parts = random.choice(files).stem.split("_")
+    original_end = parts[2]  # grab 'YYYYMMDD'
+    original_start = parts[1]  # grab 'YYYYMMDD'
 
     # Compute the new start date (two days before the last stored date)
     start = (
@@ -0,0 +1,116 @@
+from pathlib import Path
+from typing import Iterator, Optional, Sequence, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyarrow import csv as pacsv
+
+# Station files are written as Parquet; CSV is still read for legacy folders.
+HISTORY_SUFFIXES = (".parquet", ".csv")
+
+
+def iter_history_files(folder: Union[str, Path]) -> Iterator[Path]:
+    """Yield every station file (``<code>_<start>_<end>.<ext>``) in *folder*."""
+    folder = Path(folder)
+    for suffix in HISTORY_SUFFIXES:
+        yield from folder.glob(f"*{suffix}")
+
+
+def station_files(folder: Union[str, Path]) -> dict[str, Path]:
+    """Map each station code in *folder* to its current file.
+
+    Re-downloading a legacy folder leaves a ``.csv`` and a ``.parquet`` for
+    the same station; Parquet wins, then the latest end date.
+    """
+    files = sorted(
+        iter_history_files(folder),
+        key=lambda p: p.stem.split("_")[2],
+        reverse=True,
+    )
+    files.sort(key=lambda p: HISTORY_SUFFIXES.index(p.suffix))  # stable
+
+    stations: dict[str, Path] = {}
+    for path in files:
+        stations.setdefault(path.stem.split("_")[0], path)
+    return stations
+
+
+def read_history_columns(path: Union[str, Path]) -> list[str]:
+    """Return the parameter columns of a station file (``datetime`` excluded)."""
+    path = Path(path)
+    if path.suffix == ".csv":
+        names = pd.read_csv(path, nrows=0).columns
+    else:
+        names = pq.read_schema(path).names
+    return [name for name in names if name != "datetime"]
+
+
+def read_history(
+    path: Union[str, Path],
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """Load a station file into a DataFrame with a ``datetime`` column.
+
+    Parameters
+    ----------
+    path : str | pathlib.Path
+        Parquet or legacy CSV station file.
+    columns : sequence of str, optional
+        Columns to load (should include ``"datetime"``). ``None`` → all.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Typed frame (readings as ``float32``); ``datetime`` is a regular
+        column, not the index.
+    """
+    path = Path(path)
+    if path.suffix == ".csv":
+        params = (
+            read_history_columns(path) if columns is None
+            else [c for c in columns if c != "datetime"]
+        )
+        # pyarrow's multithreaded reader; numeric columns convert zero-copy
+        table = pacsv.read_csv(
+            path,
+            convert_options=pacsv.ConvertOptions(
+                include_columns=None if columns is None else list(columns),
+                column_types={
+                    "datetime": pa.timestamp("ns"),
+                    **{p: pa.float32() for p in params},
+                },
+                timestamp_parsers=["%Y-%m-%d"],
+            ),
+        )
+        return table.to_pandas()
+    # Memory-mapped so rereads are served from the OS page cache; the map is
+    # closed before returning so update_history can delete the file (Windows)
+    with pa.memory_map(str(path), "r") as source:
+        table = pq.read_table(
+            source,
+            columns=None if columns is None else list(columns),
+        )
+        return table.to_pandas(zero_copy_only=False)
+
+
+def read_last_date(
+    path: Union[str, Path], *, with_readings: bool = False
+) -> pd.Timestamp:
+    """Return the most recent ``datetime`` stored in a station file.
+
+    With *with_readings*, rows whose readings are all missing (days NASA
+    POWER had not published yet, sent as -999) are ignored; ``NaT`` when no
+    row has data.
+    """
+    if not with_readings:
+        return read_history(path, columns=["datetime"])["datetime"].max()
+    df = read_history(path).set_index("datetime")
+    return df.dropna(how="all").index.max()
+
+
+def write_history(df: pd.DataFrame, path: Union[str, Path]) -> None:
+    """Persist a ``datetime``-indexed station frame as snappy Parquet."""
+    df.reset_index().to_parquet(
+        path, engine="pyarrow", compression="snappy", index=False
+    )
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from agregate_data import build_state_mean_tables
+from history_io import write_history
+
+
+def test_state_means_exported_without_float32_noise(tmp_path):
+    (tmp_path / "metadata").mkdir()
+    (tmp_path / "metadata" / "catalogue.csv").write_text(
+        "CD_ESTACAO,SG_ESTADO\n"
+        "A001,DF\nA002,DF\nA003,DF\nA004,DF\nA005,DF\nA010,GO\n"
+    )
+    history_dir = tmp_path / "history"
+    history_dir.mkdir()
+
+    readings = {"A001": 0.24, "A002": 0.06, "A003": 0.02, "A004": 0.06,
+                "A005": 0.04, "A010": 1.17}
+    for code, value in readings.items():
+        write_history(
+            pd.DataFrame(
+                {"IMERG_PRECTOT": np.array([value], dtype=np.float32)},
+                index=pd.DatetimeIndex(["2006-01-02"], name="datetime"),
+            ),
+            history_dir / f"{code}_20060101_20250513.parquet",
+        )
+
+    build_state_mean_tables(tmp_path)
+
+    table = pd.read_excel(
+        tmp_path / "treated_data" / "IMERG_PRECTOT.xlsx", index_col=0
+    )
+    df_readings = [v for c, v in readings.items() if c != "A010"]
+    assert table.loc["2006-01-02", "DF"] == 0.084
+    assert table.loc["2006-01-02", "DF"] == round(pd.Series(df_readings).mean(), 6)
+    assert table.loc["2006-01-02", "GO"] == 1.17
+    assert table["SP"].isna().all()
+
+
+def test_station_with_csv_and_parquet_counted_once(tmp_path):
+    (tmp_path / "metadata").mkdir()
+    (tmp_path / "metadata" / "catalogue.csv").write_text(
+        "CD_ESTACAO,SG_ESTADO\nA001,DF\nA002,DF\n"
+    )
+    history_dir = tmp_path / "history"
+    history_dir.mkdir()
+
+    # legacy CSVs left behind by a re-download into Parquet
+    for code, value in (("A001", 1.0), ("A002", 3.0)):
+        (history_dir / f"{code}_20060101_20250513.csv").write_text(
+            f"datetime,IMERG_PRECTOT\n2006-01-02,{value}\n"
+        )
+        write_history(
+            pd.DataFrame(
+                {"IMERG_PRECTOT": np.array([1.0], dtype=np.float32)},
+                index=pd.DatetimeIndex(["2006-01-02"], name="datetime"),
+            ),
+            history_dir / f"{code}_20060101_20250513.parquet",
+        )
+
+    build_state_mean_tables(tmp_path)
+
+    table = pd.read_excel(
+        tmp_path / "treated_data" / "IMERG_PRECTOT.xlsx", index_col=0
+    )
+    assert table.loc["2006-01-02", "DF"] == 1.0
@@ -0,0 +1,32 @@
+import pandas as pd
+
+from cached_read import read_csv_cached
+
+
+def _write_catalogue(tmp_path):
+    csv_path = tmp_path / "catalogue.csv"
+    csv_path.write_text("CD_ESTACAO,SG_ESTADO\nA001,DF\nA002,GO\n")
+    return csv_path
+
+
+def test_reuses_cache(tmp_path):
+    csv_path = _write_catalogue(tmp_path)
+
+    first = read_csv_cached(csv_path)
+    second = read_csv_cached(csv_path)
+
+    assert (tmp_path / "catalogue.pkl").exists()
+    pd.testing.assert_frame_equal(first, second)
+    assert [p.name for p in tmp_path.iterdir() if ".tmp" in p.name] == []
+
+
+def test_truncated_cache_is_rebuilt(tmp_path):
+    csv_path = _write_catalogue(tmp_path)
+    cache = tmp_path / "catalogue.pkl"
+    read_csv_cached(csv_path)
+    cache.write_bytes(cache.read_bytes()[:20])  # newer than the CSV
+
+    result = read_csv_cached(csv_path)
+
+    pd.testing.assert_frame_equal(result, pd.read_csv(csv_path))
+    pd.testing.assert_frame_equal(read_csv_cached(csv_path), result)
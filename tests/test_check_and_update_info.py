@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+import check_and_update_info
+from history_io import read_history, write_history
+
+
+def _frame(dates, values) -> pd.DataFrame:
+    return pd.DataFrame(
+        {"IMERG_PRECTOT": np.array(values, dtype=np.float32)},
+        index=pd.DatetimeIndex(dates, name="datetime"),
+    )
+
+
+def test_update_history_merges_several_update_files_per_station(
+    tmp_path, monkeypatch
+):
+    history_dir = tmp_path / "history"
+    update_dir = tmp_path / "update"
+    history_dir.mkdir()
+    update_dir.mkdir()
+
+    write_history(
+        _frame(["2025-05-12", "2025-05-13"], [1.0, 2.0]),
+        history_dir / "A001_20060101_20250513.parquet",
+    )
+    # legacy update left over from an earlier window + the current download
+    (update_dir / "A001_20250428_20250513.csv").write_text(
+        "datetime,IMERG_PRECTOT\n2025-05-13,3.0\n"
+    )
+    write_history(
+        _frame(["2025-05-13", "2025-05-14"], [4.0, 5.0]),
+        update_dir / "A001_20250514_20250515.parquet",
+    )
+
+    monkeypatch.setattr(
+        check_and_update_info,
+        "find_start_and_end_date",
+        lambda _: ("20060101", "20250513", "20250511", "20250515"),
+    )
+    monkeypatch.setattr(
+        check_and_update_info,
+        "extract_data_multiple_coordinates",
+        lambda **kwargs: None,
+    )
+
+    check_and_update_info.update_history(str(tmp_path))
+
+    files = [p.name for p in history_dir.iterdir()]
+    assert files == ["A001_20060101_20250515.parquet"]
+
+    merged = read_history(history_dir / files[0]).set_index("datetime")
+    pd.testing.assert_frame_equal(
+        merged.sort_index(),
+        _frame(["2025-05-12", "2025-05-13", "2025-05-14"], [1.0, 4.0, 5.0]),
+    )
+
+
+def _run_window(tmp_path, monkeypatch, tail_value) -> str:
+    history_dir = tmp_path / "history"
+    history_dir.mkdir()
+    write_history(
+        _frame(["2025-05-12", "2025-05-13"], [1.0, tail_value]),
+        history_dir / "A001_20060101_20250513.parquet",
+    )
+    monkeypatch.setattr(
+        check_and_update_info,
+        "find_start_and_end_date",
+        lambda _: ("20060101", "20250513", "20250511", "20250515"),
+    )
+    calls = []
+    monkeypatch.setattr(
+        check_and_update_info,
+        "extract_data_multiple_coordinates",
+        lambda **kwargs: calls.append(kwargs),
+    )
+
+    check_and_update_info.update_history(str(tmp_path))
+
+    return calls[0]["start"]
+
+
+def test_update_history_skips_buffer_after_clean_tail(tmp_path, monkeypatch):
+    assert _run_window(tmp_path, monkeypatch, 2.0) == "20250514"
+
+
+def test_update_history_keeps_buffer_after_missing_tail(tmp_path, monkeypatch):
+    assert _run_window(tmp_path, monkeypatch, np.nan) == "20250511"
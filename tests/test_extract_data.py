@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+
+import extract_data
+
+POWER_CSV = (
+    "-BEGIN HEADER-\n"
+    "NASA/POWER Source Native Resolution Daily Data\n"
+    "-END HEADER-\n"
+    "YEAR,DOY,IMERG_PRECTOT,T2M\n"
+    "2023,365,0.5,21.0\n"
+    "2024,1,-999,22.5\n"
+    "2024,60,1.25,23.0\n"
+    "2024,366,0.0,24.75\n"
+)
+
+
+class _Response:
+    status_code = 200
+    text = POWER_CSV
+
+
+def _extract(monkeypatch) -> pd.DataFrame:
+    monkeypatch.setattr(
+        extract_data._SESSION, "get", lambda *args, **kwargs: _Response()
+    )
+    return extract_data.extract_data_coord(params="IMERG_PRECTOT,T2M")
+
+
+def test_year_doy_to_datetime(monkeypatch):
+    df = _extract(monkeypatch)
+
+    expected = pd.DatetimeIndex(
+        ["2023-12-31", "2024-01-01", "2024-02-29", "2024-12-31"],
+        name="datetime",
+    )
+    pd.testing.assert_index_equal(df.index, expected)
+
+
+def test_columns_typed_and_missing_values(monkeypatch):
+    df = _extract(monkeypatch)
+
+    assert list(df.columns) == ["IMERG_PRECTOT", "T2M"]
+    assert (df.dtypes == np.float32).all()
+    assert np.isnan(df.loc["2024-01-01", "IMERG_PRECTOT"])
+    assert df.loc["2024-12-31", "T2M"] == np.float32(24.75)
+
+
+def test_save_error_skips_only_that_station(tmp_path, monkeypatch):
+    metadata = tmp_path / "metadata"
+    metadata.mkdir()
+    (metadata / "catalogue.csv").write_text(
+        "DC_NOME,SG_ESTADO,VL_LATITUDE,VL_LONGITUDE,CD_ESTACAO\n"
+        "BRASILIA,DF,-15.79,-47.93,A001\n"
+        "GOIANIA,GO,-16.64,-49.22,A002\n"
+    )
+    (metadata / "coastal.csv").write_text("CD_ESTACAO\n")
+
+    monkeypatch.setattr(
+        extract_data._SESSION, "get", lambda *args, **kwargs: _Response()
+    )
+    real_write = extract_data.write_history
+
+    def flaky_write(df, path):
+        if path.name.startswith("A001"):
+            raise OSError("disk full")
+        real_write(df, path)
+
+    monkeypatch.setattr(extract_data, "write_history", flaky_write)
+
+    extract_data.extract_data_multiple_coordinates(
+        log=None,
+        start="20240101",
+        end="20240102",
+        base_path=tmp_path,
+        max_workers=2,
+    )
+
+    saved = [p.name for p in (tmp_path / "history").iterdir()]
+    assert saved == ["A002_20240101_20240102.parquet"]
+
+
+def test_legacy_csv_counts_as_downloaded(tmp_path, monkeypatch):
+    metadata = tmp_path / "metadata"
+    metadata.mkdir()
+    (metadata / "catalogue.csv").write_text(
+        "DC_NOME,SG_ESTADO,VL_LATITUDE,VL_LONGITUDE,CD_ESTACAO\n"
+        "BRASILIA,DF,-15.79,-47.93,A001\n"
+    )
+    (metadata / "coastal.csv").write_text("CD_ESTACAO\n")
+    history_dir = tmp_path / "history"
+    history_dir.mkdir()
+    (history_dir / "A001_20240101_20240102.csv").write_text(
+        "datetime,IMERG_PRECTOT\n2024-01-01,0.5\n"
+    )
+
+    requests_made = []
+
+    def fake_get(*args, **kwargs):
+        requests_made.append(kwargs)
+        return _Response()
+
+    monkeypatch.setattr(extract_data._SESSION, "get", fake_get)
+
+    extract_data.extract_data_multiple_coordinates(
+        log=None, start="20240101", end="20240102", base_path=tmp_path
+    )
+
+    assert requests_made == []
+    assert [p.name for p in history_dir.iterdir()] == [
+        "A001_20240101_20240102.csv"
+    ]
+
+
+def test_request_error_reported_on_one_line(monkeypatch, capsys):
+    class _ErrorResponse:
+        status_code = 422
+        text = '{"messages": ["bad request"],\n "header": {}}'
+
+    monkeypatch.setattr(
+        extract_data._SESSION, "get", lambda *args, **kwargs: _ErrorResponse()
+    )
+
+    df = extract_data.extract_data_coord()
+
+    captured = capsys.readouterr()
+    assert df.empty
+    assert captured.out.count("\n") == 1
+    assert "422" in captured.out
+    assert "bad request" not in captured.out
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+from history_io import (
+    iter_history_files,
+    read_history,
+    read_history_columns,
+    read_last_date,
+    station_files,
+    write_history,
+)
+
+
+def _station_frame() -> pd.DataFrame:
+    index = pd.DatetimeIndex(
+        ["2025-05-11", "2025-05-12", "2025-05-13"], name="datetime"
+    )
+    return pd.DataFrame(
+        {
+            "IMERG_PRECTOT": np.array([0.23, np.nan, 1.5], dtype=np.float32),
+            "T2M": np.array([21.4, 22.0, 19.8], dtype=np.float32),
+        },
+        index=index,
+    )
+
+
+def test_parquet_round_trip(tmp_path):
+    df = _station_frame()
+    path = tmp_path / "A001_20250511_20250513.parquet"
+
+    write_history(df, path)
+    result = read_history(path)
+
+    pd.testing.assert_frame_equal(result.set_index("datetime"), df)
+
+
+def test_parquet_column_subset(tmp_path):
+    path = tmp_path / "A001_20250511_20250513.parquet"
+    write_history(_station_frame(), path)
+
+    result = read_history(path, columns=["datetime", "T2M"])
+
+    assert list(result.columns) == ["datetime", "T2M"]
+    assert read_history_columns(path) == ["IMERG_PRECTOT", "T2M"]
+
+
+def test_legacy_csv(tmp_path):
+    path = tmp_path / "A001_20250511_20250513.csv"
+    path.write_text(
+        "datetime,IMERG_PRECTOT,T2M\n"
+        "2025-05-11,0.23,21.4\n"
+        "2025-05-12,,22.0\n"
+        "2025-05-13,1.5,19.8\n"
+    )
+
+    result = read_history(path)
+
+    pd.testing.assert_frame_equal(
+        result.set_index("datetime"), _station_frame(), check_index_type=False
+    )
+    assert result["datetime"].dtype == "datetime64[ns]"
+    assert read_history_columns(path) == ["IMERG_PRECTOT", "T2M"]
+
+
+def test_legacy_csv_column_subset(tmp_path):
+    path = tmp_path / "A001_20250511_20250513.csv"
+    path.write_text("datetime,IMERG_PRECTOT,T2M\n2025-05-11,0.23,21.4\n")
+
+    result = read_history(path, columns=["datetime", "T2M"])
+
+    assert list(result.columns) == ["datetime", "T2M"]
+    assert result["T2M"].dtype == np.float32
+
+
+def test_read_last_date(tmp_path):
+    parquet_path = tmp_path / "A001_20250511_20250513.parquet"
+    write_history(_station_frame(), parquet_path)
+    csv_path = tmp_path / "A002_20250511_20250513.csv"
+    csv_path.write_text(
+        "datetime,IMERG_PRECTOT\n2025-05-13,0.1\n2025-05-11,0.2\n"
+    )
+
+    assert read_last_date(parquet_path) == pd.Timestamp("2025-05-13")
+    assert read_last_date(csv_path) == pd.Timestamp("2025-05-13")
+
+
+def test_read_last_date_with_readings(tmp_path):
+    path = tmp_path / "A001_20250511_20250513.parquet"
+    df = _station_frame()
+    df.loc["2025-05-13"] = np.nan  # not yet published (-999)
+    write_history(df, path)
+
+    assert read_last_date(path) == pd.Timestamp("2025-05-13")
+    assert read_last_date(path, with_readings=True) == pd.Timestamp("2025-05-12")
+
+
+def test_iter_history_files(tmp_path):
+    for name in ("A001_1_2.parquet", "A002_1_2.csv", "notes.txt"):
+        (tmp_path / name).touch()
+
+    names = sorted(p.name for p in iter_history_files(tmp_path))
+
+    assert names == ["A001_1_2.parquet", "A002_1_2.csv"]
+
+
+def test_station_files_prefers_parquet_then_latest(tmp_path):
+    for name in (
+        "A001_20060101_20250513.csv",
+        "A001_20060101_20251013.parquet",
+        "A002_20060101_20250513.csv",
+        "A003_20060101_20250513.parquet",
+        "A003_20060101_20250601.parquet",
+    ):
+        (tmp_path / name).touch()
+
+    stations = {code: p.name for code, p in station_files(tmp_path).items()}
+
+    assert stations == {
+        "A001": "A001_20060101_20251013.parquet",
+        "A002": "A002_20060101_20250513.csv",
+        "A003": "A003_20060101_20250601.parquet",
+    }